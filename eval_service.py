@@ -0,0 +1,492 @@
+# eval_service.py
+
+"""
+Local evaluation service shared by every Streamlit session.
+
+Each Streamlit session used to run its own evaluation loop and its own
+roster/schedule fetches.  This module runs a single local HTTP process
+that owns those caches and the batch engine in ``slate_evaluator.py`` so
+that throughput scales with the amount of *distinct* work rather than with
+the number of analysts looking at the same slate.
+
+* Identical concurrent requests are coalesced (single‑flight): if two
+  sessions submit the same slate, two slates share a prop row, or two rows
+  need the same factor (see ``factor_planner``), the work is done once and
+  every waiter receives the same result.
+* Finished results are kept for ``result_ttl`` seconds so that repeated
+  requests shortly afterwards are answered from memory.
+* Row work is queued per client and dispatched round‑robin to a fixed
+  worker pool, so one analyst uploading a 1,000‑row slate does not starve
+  another analyst's 20‑row slate.
+
+Run the service with::
+
+    python eval_service.py --port 8765
+
+and point the app at it with the ``MLB_EVAL_SERVICE_URL`` environment
+variable (default ``http://127.0.0.1:8765``).  If the service is not
+running the app falls back to evaluating in‑process.
+
+Endpoints
+---------
+
+``GET /health``
+    Returns ``{"status": "ok"}``.
+``GET /version``
+    Returns ``{"version": "..."}``, which changes whenever cached results are
+    invalidated.
+``POST /version``
+    Body ``{"players": [...]}`` (the slate's ``Player`` names).  Returns a
+    version that changes only when results for one of those players are
+    invalidated.  Clients that cache a slate's results themselves should
+    key on it.
+``POST /evaluate``
+    Body ``{"rows": [...]}`` using the RotoWire column names.  The optional
+    ``X-Client-Id`` header identifies the caller for fair scheduling.
+    Returns ``{"results": [...]}`` in the same order as ``rows``.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+DEFAULT_SERVICE_URL = os.environ.get("MLB_EVAL_SERVICE_URL", "http://127.0.0.1:8765")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run ``fn()`` once per in‑flight ``key`` and share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+
+        if not leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["event"].set()
+        return call["result"]
+
+
+class TTLCache:
+    """Small thread‑safe key/value cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FairScheduler:
+    """Worker pool that serves per‑client task queues in round‑robin order."""
+
+    def __init__(self, workers=8):
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"eval-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, client_id, fn, *args):
+        """Queue ``fn(*args)`` on behalf of ``client_id`` and return a Future."""
+        future = Future()
+        with self._cond:
+            self._queues.setdefault(client_id, deque()).append((future, fn, args))
+            self._cond.notify()
+        return future
+
+    def _next_task(self):
+        with self._cond:
+            while not self._queues:
+                self._cond.wait()
+            client_id, queue = next(iter(self._queues.items()))
+            task = queue.popleft()
+            # Rotate the client to the back so the next pick serves someone else
+            del self._queues[client_id]
+            if queue:
+                self._queues[client_id] = queue
+            return task
+
+    def _worker(self):
+        while True:
+            future, fn, args = self._next_task()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+def slate_key(rows):
+    """Return a content hash identifying a slate regardless of who submitted it."""
+    payload = json.dumps(rows, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EvaluationService:
+    """Owns the reference data, result caches and batch engine for all clients."""
+
+    def __init__(self, workers=8, result_ttl=300, reference_ttl=3600):
+        self.scheduler = FairScheduler(workers)
+        self.flights = SingleFlight()
+        self.reference_ttl = reference_ttl
+        self.row_results = TTLCache(result_ttl)
+        self.factor_results = TTLCache(result_ttl)
+        self.slate_results = TTLCache(result_ttl, max_entries=256)
+        self._reference = None
+        self._reference_loaded = 0.0
+        self._schedule_stale = False
+        self._player_ids = {}       # row player name -> MLBAM ID
+        # Invalidation counters.  A computation records the counter it started
+        # under, includes it in its single-flight key and only stores its
+        # result if the counter is unchanged, so work that was already in
+        # flight when an invalidation ran can never repopulate a cache.
+        self._epoch_lock = threading.Lock()
+        self._generation = 0        # bumped by invalidate(): everything is stale
+        self._slate_generation = 0  # bumped by every invalidation
+        self._player_epochs = {}    # bumped per player ID by invalidate_players()
+        self._instance = uuid.uuid4().hex[:8]
+
+    @property
+    def version(self):
+        """Identifier that changes whenever any cached result is invalidated."""
+        return f"{self._instance}-{self._slate_generation}"
+
+    def slate_version(self, players):
+        """Identifier that changes only when results for ``players`` (row names) are invalidated.
+
+        Epochs only ever increase, so their sum changes whenever one does.
+        Names that no row has resolved yet have no cached results to go stale.
+        """
+        from prop_edge import normalize_name
+
+        keys = {self._player_ids.get(normalize_name(name), normalize_name(name)) for name in players}
+        with self._epoch_lock:
+            epochs = sum(self._player_epochs.get(key, 0) for key in keys)
+            return f"{self._instance}-{self._generation}-{epochs}"
+
+    def _row_epoch(self, player):
+        return (self._generation, self._player_epochs.get(player, 0))
+
+    def _store_if_current(self, cache, key, value, epoch_fn, epoch):
+        """Cache ``value`` unless an invalidation ran since ``epoch`` was read."""
+        with self._epoch_lock:
+            if epoch_fn() == epoch:
+                cache.set(key, value)
+
+    def reference_data(self):
+        """Return ``(roster_mapping, team_mapping, schedule)``, refreshing when stale.
+
+        The roster and team maps (a walk over all 30 rosters) are reloaded
+        every ``reference_ttl`` seconds.  The schedule alone is reloaded
+        after ``apply_delta`` reports a venue, umpire or game list change.
+        """
+        if self._reference is None or time.monotonic() - self._reference_loaded > self.reference_ttl:
+            def load():
+                from slate_evaluator import load_reference_data
+                self._schedule_stale = False
+                self._reference = load_reference_data()
+                self._player_ids = {}
+                self._reference_loaded = time.monotonic()
+                return self._reference
+            return self.flights.do(("reference",), load)
+        if self._schedule_stale:
+            def load_schedule():
+                from game_utils import get_today_schedule
+                # Cleared first so a delta arriving mid-fetch marks it stale again
+                self._schedule_stale = False
+                roster_mapping, team_mapping, _ = self._reference
+                self._reference = (roster_mapping, team_mapping, get_today_schedule())
+                return self._reference
+            return self.flights.do(("schedule",), load_schedule)
+        return self._reference
+
+    def _player_key(self, name):
+        """Return the MLBAM ID for a row's player (the row name if unresolved).
+
+        Deltas from ``lineup_poller`` identify players by ID, so row results
+        are invalidated by ID rather than by how the slate spells the name.
+        """
+        if name not in self._player_ids:
+            from prop_edge import get_player_id
+            self._player_ids[name] = get_player_id(name, self.reference_data()[0]) or name
+        return self._player_ids[name]
+
+    def invalidate(self):
+        """Drop every cached result (e.g. after lineups or weather change)."""
+        with self._epoch_lock:
+            self._generation += 1
+            self._slate_generation += 1
+        self.row_results.clear()
+        self.factor_results.clear()
+        self.slate_results.clear()
+
+    def invalidate_players(self, players):
+        """Drop cached results for the given players (MLBAM IDs) only."""
+        players = set(players)
+        if not players:
+            return
+        with self._epoch_lock:
+            self._slate_generation += 1
+            for player in players:
+                self._player_epochs[player] = self._player_epochs.get(player, 0) + 1
+        # Factor values (splits, trends, weather) do not depend on lineups or
+        # probables, so they stay cached; only results built from them go.
+        self.row_results.discard_where(lambda key: key[1] in players)
+        # Slates are cheap to reassemble from the remaining row cache
+        self.slate_results.clear()
+
+    def apply_delta(self, delta):
+        """Invalidate what a ``lineup_poller`` game delta affects."""
+        if delta["new_game"] or delta["removed"] or {"venue", "plate_umpire"} & set(delta["changes"]):
+            # Ballpark, home/away and plate umpire come from the schedule; reload
+            # only that lazily, the roster and team maps are still current
+            self._schedule_stale = True
+        self.invalidate_players(delta["players"])
+
+    def fetch_factor(self, name, key):
+        """Fetch one planned factor through the shared cache, coalescing duplicates."""
+        from factor_planner import fetch_factor
+
+        cache_key = (name, key)
+        cached = self.factor_results.get(cache_key)
+        if cached is not None:
+            return cached
+
+        generation = self._generation
+
+        def compute():
+            value = fetch_factor(name, key)
+            self._store_if_current(self.factor_results, cache_key, value,
+                                   lambda: self._generation, generation)
+            return value
+        return self.flights.do(("factor", generation) + cache_key, compute)
+
+    def evaluate_row(self, row, main_line=None):
+        """Evaluate one row; ``main_line`` is its player's main line in the market."""
+        from slate_evaluator import evaluate_row, row_key
+
+        key = row_key(row)
+        player = self._player_key(key[0])
+        key = ("row", player) + key + (main_line,)
+        cached = self.row_results.get(key)
+        if cached is not None:
+            return cached
+
+        epoch = self._row_epoch(player)
+
+        def compute():
+            result = evaluate_row(row, *self.reference_data(), fetch=self.fetch_factor,
+                                  main_line=main_line)
+            self._store_if_current(self.row_results, key, result,
+                                   lambda: self._row_epoch(player), epoch)
+            return result
+        return self.flights.do(key + epoch, compute)
+
+    def evaluate_slate(self, rows, client_id="anonymous"):
+        """Evaluate ``rows`` with slate‑level and row‑level request coalescing."""
+        from slate_evaluator import annotate_best_lines, main_lines
+
+        key = ("slate", slate_key(rows))
+        cached = self.slate_results.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self._slate_generation
+
+        def compute():
+            self.reference_data()
+            futures = [self.scheduler.submit(client_id, self.evaluate_row, row, main_line)
+                       for row, main_line in zip(rows, main_lines(rows))]
+            results = annotate_best_lines([f.result() for f in futures])
+            self._store_if_current(self.slate_results, key, results,
+                                   lambda: self._slate_generation, generation)
+            return results
+        return self.flights.do(key + (generation,), compute)
+
+
+def make_handler(service):
+    """Build a request handler class bound to ``service``."""
+
+    class EvaluationHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/version":
+                self._send_json(200, {"version": service.version})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path not in ("/evaluate", "/version"):
+                self._send_json(404, {"error": "not found"})
+                return
+            field = "rows" if self.path == "/evaluate" else "players"
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                items = payload.get(field)
+                if not isinstance(items, list):
+                    raise ValueError(f"'{field}' must be a list")
+            except (ValueError, AttributeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            if self.path == "/version":
+                self._send_json(200, {"version": service.slate_version(str(p) for p in items)})
+                return
+            rows = items
+            client_id = self.headers.get("X-Client-Id") or self.client_address[0]
+            try:
+                results = service.evaluate_slate(rows, client_id=client_id)
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send_json(200, {"results": results})
+
+        def log_message(self, format, *args):
+            pass
+
+    return EvaluationHandler
+
+
+def serve(host="127.0.0.1", port=8765, workers=8, result_ttl=300, poll_interval=60,
+          statsapi_url=None):
+    """Start the evaluation service and block until interrupted.
+
+    When ``poll_interval`` is positive a ``lineup_poller.DeltaPoller`` runs in
+    the background and invalidates only the players touched by lineup,
+    probable pitcher or umpire changes.
+    """
+    service = EvaluationService(workers=workers, result_ttl=result_ttl)
+    poller = None
+    if poll_interval > 0:
+        from lineup_poller import DeltaPoller, STATSAPI_BASE_URL
+        poller = DeltaPoller(service.apply_delta, interval=poll_interval,
+                             base_url=statsapi_url or STATSAPI_BASE_URL)
+        poller.start()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if poller is not None:
+            poller.stop()
+        server.server_close()
+
+
+def evaluate_slate_remote(rows, base_url=DEFAULT_SERVICE_URL, client_id=None, timeout=300):
+    """Evaluate ``rows`` through a running service and return the result records.
+
+    Raises ``requests.ConnectionError`` if the service is not running so
+    that callers can fall back to in‑process evaluation.  Timeouts and
+    error responses raise the other ``requests.RequestException`` types and
+    should be reported rather than retried in‑process.
+    """
+    headers = {"X-Client-Id": client_id} if client_id else {}
+    resp = requests.post(f"{base_url}/evaluate", json={"rows": rows}, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()["results"]
+
+
+def service_version(base_url=DEFAULT_SERVICE_URL, timeout=5, players=None):
+    """Return the running service's cache version (see ``GET /version``).
+
+    With ``players``, return the version scoped to those players instead
+    (see ``POST /version``).
+    """
+    if players is None:
+        resp = requests.get(f"{base_url}/version", timeout=timeout)
+    else:
+        resp = requests.post(f"{base_url}/version", json={"players": list(players)}, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()["version"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local MLB prop evaluation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--result-ttl", type=int, default=300, help="Seconds to keep finished results")
+    parser.add_argument("--poll-interval", type=int, default=60,
+                        help="Seconds between lineup/probable pitcher polls (0 disables)")
+    parser.add_argument("--statsapi-url", default=None,
+                        help="Override the statsapi base URL (e.g. a local replay stub)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.result_ttl, args.poll_interval, args.statsapi_url)
+
+
+if __name__ == "__main__":
+    main()
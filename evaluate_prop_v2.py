@@ -1,19 +1,27 @@
 # evaluate_prop_v2.py
 
-import random
+from factor_planner import plan_fetches, execute_plan, resolve_factors
+from prop_distribution import cached_distribution, prob_side
 
-# Load static multipliers or weights from other files (assumes you already imported them somewhere)
-from bvp_data import bvp_lookup
-from home_away_split import get_home_away_multiplier
-from recent_trend import get_recent_trend_multiplier
-from umpire_factors import get_umpire_multiplier
-from stadium_factors import get_stadium_multiplier
-from weather_factors import get_weather_multiplier
 
-
-def evaluate_prop_v2(player_name, prop_type, line, side, is_home, ballpark, player_id):
+def evaluate_prop_v2(player_name, prop_type, line, side, is_home, ballpark, player_id,
+                     umpire=None, factors=None, main_line=None):
     """
     Final prop evaluation function that combines all known factors into one prediction.
+
+    Only the factors relevant to ``prop_type`` are applied (see
+    ``factor_planner.MARKET_FACTORS``).  Pass ``factors`` (a ``{factor:
+    multiplier}`` dict from ``factor_planner.resolve_factors``) to reuse
+    fetches planned for the whole slate; otherwise they are fetched here.
+
+    When a ``line`` is given the probability is that of ``side`` ("over" or
+    "under") winning at that line under the prop's outcome distribution
+    (``prop_distribution``).  The distribution is fitted so that
+    ``main_line`` (the player's main line in this market, default ``line``)
+    is a coin flip under neutral factors, so the factors move the main line
+    away from 0.5 and alternate lines are priced from the same distribution.
+    Without a line the fair baseline is scaled by the factors instead.
+
     Returns:
     - Probability (float 0–1)
     - Percent (0–100)
@@ -22,35 +30,35 @@ def evaluate_prop_v2(player_name, prop_type, line, side, is_home, ballpark, play
     - Edge (probability - fair baseline of 0.5)
     """
 
-    # 🔹 1. Start with base BvP data (0.5 if not found)
-    bvp_prob = bvp_lookup(player_name, prop_type)
-    if bvp_prob is None:
-        bvp_prob = 0.50
-
-    # 🔹 2. Apply home/away split
-    home_away_mult = get_home_away_multiplier(player_name, is_home)
+    # 🔹 1. Start from the fair baseline
+    base_prob = 0.50
 
-    # 🔹 3. Stadium multiplier
-    stadium_mult = get_stadium_multiplier(ballpark, prop_type)
+    # 🔹 2. Resolve the market's factors (home/away, trend, weather, ballpark, umpire)
+    if factors is None:
+        ctx = {
+            "player_name": player_name,
+            "prop_type": prop_type,
+            "home_away": {True: "Home", False: "Away"}.get(is_home, "N/A"),
+            "ballpark": ballpark,
+            "umpire": umpire,
+        }
+        factors = resolve_factors(ctx, execute_plan(plan_fetches([ctx])))
 
-    # 🔹 4. Weather effect
-    weather_mult = get_weather_multiplier(ballpark, prop_type)
-
-    # 🔹 5. Umpire effect
-    umpire_mult = get_umpire_multiplier(ballpark, prop_type)
-
-    # 🔹 6. Recent trend adjustment
-    trend_mult = get_recent_trend_multiplier(player_name, prop_type)
-
-    # 🔹 7. Combine all
-    final_prob = bvp_prob
-    for mult in [home_away_mult, stadium_mult, weather_mult, umpire_mult, trend_mult]:
-        final_prob *= mult
+    # 🔹 3. Probability of the lean at the offered line
+    if line is not None:
+        main_line = line if main_line is None else main_line
+        dist = cached_distribution(prop_type, tuple(sorted(factors.items())), main_line)
+        final_prob = float(prob_side(dist, [line], side)[0])
+    else:
+        # No line to price: scale the fair baseline by every factor
+        final_prob = base_prob
+        for mult in factors.values():
+            final_prob *= mult
 
     # Clamp between 0.01 and 0.99 to avoid extremes
     final_prob = max(0.01, min(0.99, final_prob))
 
-    # 🔹 8. Confidence and Recommendation
+    # 🔹 4. Confidence and Recommendation
     if final_prob >= 0.75:
         confidence = "🔥 Very High"
         recommendation = "✅ Yes"
@@ -0,0 +1,203 @@
+# factor_planner.py
+
+"""
+Market‑aware factor planning.
+
+Not every factor matters for every market: weather and the home/away
+batting‑average split say nothing about a pitcher's strikeouts, and the
+umpire's zone says little about a hitter's total bases.  ``MARKET_FACTORS``
+declares which factors each market depends on, and the planner turns a
+slate into the minimal, de‑duplicated set of fetches.  For two Dodgers
+hitters at home::
+
+    props = [
+        {"player_name": "Mookie Betts", "prop_type": "Hits", "home_away": "Home", "ballpark": "Dodger Stadium"},
+        {"player_name": "Freddie Freeman", "prop_type": "Hits", "home_away": "Home", "ballpark": "Dodger Stadium"},
+    ]
+    plan = plan_fetches(props)
+    # [("home_away", (season,)), ("recent_trend", (long_start, short_start, today)),
+    #  ("weather", ("Dodger Stadium",)), ("ballpark", ("Dodger Stadium", "hit"))]
+    resolved = execute_plan(plan)
+    resolve_factors(props[0], resolved)   # {factor: multiplier} for Betts
+
+Each factor in ``FACTORS`` has a ``key`` function that extracts the inputs
+it depends on from a prop context (``None`` when the inputs are missing, in
+which case the factor is skipped) and a ``fetch`` function that computes the
+multiplier from that key.  Props that share a key share the fetch.
+
+Per‑player factors built from league‑wide data (the home/away split and the
+recent trend) are keyed by the league download instead of by player: their
+``fetch`` returns a ``{player: multiplier}`` table for everyone and their
+``pick`` function looks one prop's player up in it.  A slate therefore costs
+one download per season or date window, however many players it has.
+"""
+
+from datetime import datetime
+
+from ballpark_factors import BALLPARK_FACTORS
+from home_away_split import get_home_away_ratios, home_away_multiplier
+from prop_edge import normalize_name
+from umpire_data import get_umpire_adjustment
+from weather_factors import get_weather_multiplier
+
+
+def _recent_trend_key(ctx):
+    # recent_trend needs pybaseball at import time; only load it when used
+    try:
+        from recent_trend import trend_windows
+    except ImportError:
+        return None
+    return trend_windows()
+
+
+def _recent_trend_ratios(long_start, short_start, end):
+    from recent_trend import get_recent_trend_ratios
+    return get_recent_trend_ratios(long_start, short_start, end)
+
+
+def normalize_market(prop_type):
+    """Normalize a market name (``"Player Hits"`` -> ``"hits"``)."""
+    key = str(prop_type or "").strip().lower()
+    for prefix in ("player ", "batter "):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    return key
+
+
+# Stat column in BALLPARK_FACTORS / umpire tendencies that drives each market
+MARKET_STAT = {
+    "hits": "hit",
+    "singles": "hit",
+    "doubles": "hit",
+    "total bases": "hit",
+    "runs": "hit",
+    "rbis": "hit",
+    "hits + runs + rbis": "hit",
+    "home runs": "home_run",
+    "walks": "walk",
+    "strikeouts": "strikeout",
+    "pitcher strikeouts": "strikeout",
+    "pitching outs": "strikeout",
+    "hits allowed": "hit",
+    "earned runs": "hit",
+    "earned runs allowed": "hit",
+    "walks allowed": "walk",
+}
+
+_HITTING = ("home_away", "recent_trend", "weather", "ballpark")
+
+# Declarative market -> factor dependency map
+MARKET_FACTORS = {
+    "hits": _HITTING,
+    "singles": _HITTING,
+    "doubles": _HITTING,
+    "total bases": _HITTING,
+    "runs": _HITTING,
+    "rbis": _HITTING,
+    "hits + runs + rbis": _HITTING,
+    "home runs": _HITTING,
+    "walks": ("ballpark", "umpire"),
+    "strikeouts": ("ballpark", "umpire"),
+    "stolen bases": (),
+    "pitcher strikeouts": ("ballpark", "umpire"),
+    "pitching outs": ("ballpark", "umpire"),
+    "hits allowed": ("weather", "ballpark"),
+    "earned runs": ("weather", "ballpark"),
+    "earned runs allowed": ("weather", "ballpark"),
+    "walks allowed": ("ballpark", "umpire"),
+}
+
+# Markets we do not recognise keep the previous behaviour of applying everything
+DEFAULT_FACTORS = ("home_away", "recent_trend", "weather", "ballpark", "umpire")
+
+
+def _known(value):
+    return value not in (None, "", "N/A")
+
+
+FACTORS = {
+    "home_away": {
+        "key": lambda ctx: (datetime.today().year,) if ctx.get("home_away") in ("Home", "Away") else None,
+        "fetch": get_home_away_ratios,
+        "pick": lambda ratios, ctx: home_away_multiplier(ratios, ctx["player_name"], ctx["home_away"] == "Home"),
+    },
+    "recent_trend": {
+        "key": _recent_trend_key,
+        "fetch": _recent_trend_ratios,
+        "pick": lambda ratios, ctx: ratios.get(normalize_name(ctx["player_name"]), 1.0),
+    },
+    "weather": {
+        "key": lambda ctx: (ctx["ballpark"],) if _known(ctx.get("ballpark")) else None,
+        "fetch": get_weather_multiplier,
+    },
+    "ballpark": {
+        "key": lambda ctx: (ctx["ballpark"], MARKET_STAT.get(normalize_market(ctx["prop_type"]), "hit"))
+        if _known(ctx.get("ballpark")) else None,
+        "fetch": lambda ballpark, stat: BALLPARK_FACTORS.get(ballpark, {}).get(stat, 1.0),
+    },
+    "umpire": {
+        "key": lambda ctx: (ctx["umpire"], MARKET_STAT.get(normalize_market(ctx["prop_type"]), "strikeout"))
+        if _known(ctx.get("umpire")) else None,
+        "fetch": get_umpire_adjustment,
+    },
+}
+
+
+def factors_for_market(prop_type):
+    """Return the names of the factors that ``prop_type`` depends on."""
+    return MARKET_FACTORS.get(normalize_market(prop_type), DEFAULT_FACTORS)
+
+
+def _fetch_keys(ctx):
+    for name in factors_for_market(ctx["prop_type"]):
+        key = FACTORS[name]["key"](ctx)
+        if key is not None:
+            yield name, key
+
+
+def plan_fetches(props):
+    """Return the de‑duplicated list of ``(factor, key)`` fetches a slate needs.
+
+    ``props`` is an iterable of prop contexts, i.e. dicts with
+    ``player_name``, ``prop_type``, ``home_away`` ("Home", "Away" or
+    "N/A"), ``ballpark`` and optionally ``umpire``.
+    """
+    plan = {}
+    for ctx in props:
+        for fetch in _fetch_keys(ctx):
+            plan.setdefault(fetch, None)
+    return list(plan)
+
+
+def fetch_factor(name, key):
+    """Compute a single factor, returning the neutral value if it fails.
+
+    Factors with a ``pick`` function return their league‑wide table
+    (neutral: empty); the others return a float multiplier (neutral: 1.0).
+    """
+    table = "pick" in FACTORS[name]
+    try:
+        value = FACTORS[name]["fetch"](*key)
+        return dict(value) if table else float(value)
+    except Exception:
+        return {} if table else 1.0
+
+
+def execute_plan(plan, fetch=fetch_factor):
+    """Run every fetch in ``plan`` once and return ``{(factor, key): value}``.
+
+    ``fetch`` can be replaced to route fetches through a shared cache.
+    """
+    return {(name, key): fetch(name, key) for name, key in plan}
+
+
+def resolve_factors(ctx, resolved):
+    """Return ``{factor: multiplier}`` for one prop from executed plan results."""
+    factors = {}
+    for name, key in _fetch_keys(ctx):
+        pick = FACTORS[name].get("pick")
+        if pick:
+            factors[name] = float(pick(resolved.get((name, key)) or {}, ctx))
+        else:
+            factors[name] = resolved.get((name, key), 1.0)
+    return factors
@@ -38,13 +38,21 @@ def build_player_team_mapping():
     return mapping
 
 
+def get_plate_umpire(game):
+    """Return the home plate umpire's name from a schedule game hydrated with ``officials``."""
+    for official in game.get("officials", []):
+        if official.get("officialType") == "Home Plate":
+            return official.get("official", {}).get("fullName", "")
+    return ""
+
+
 def get_today_schedule():
     try:
         today_date = datetime.now(ZoneInfo("America/Los_Angeles")).date()
     except Exception:
         today_date = datetime.utcnow().date()
     try:
-        resp = requests.get("https://statsapi.mlb.com/api/v1/schedule", params={"sportId": 1, "date": today_date.isoformat()}, timeout=10)
+        resp = requests.get("https://statsapi.mlb.com/api/v1/schedule", params={"sportId": 1, "date": today_date.isoformat(), "hydrate": "officials"}, timeout=10)
         data = resp.json()
     except Exception:
         data = {}
@@ -55,9 +63,30 @@ def get_today_schedule():
                 "home_team_id": game["teams"]["home"]["team"]["id"],
                 "away_team_id": game["teams"]["away"]["team"]["id"],
                 "ballpark": game["venue"]["name"],
+                "plate_umpire": get_plate_umpire(game),
             })
     return games
 
 
 def get_game_info_for_player(player_name, roster_mapping, team_mapping, schedule):
-    from prop_edge import get_playe
+    """Return ``{"home_away", "ballpark", "plate_umpire"}`` for the player's game today.
+
+    The player is resolved to an MLBAM ID, the ID to a team through
+    ``team_mapping`` and the team to today's game in ``schedule`` (as
+    returned by ``get_today_schedule``).  Any step that fails leaves the
+    fields at ``"N/A"`` (no umpire).
+    """
+    from prop_edge import get_player_id
+
+    info = {"home_away": "N/A", "ballpark": "N/A", "plate_umpire": ""}
+    player_id = get_player_id(player_name, roster_mapping)
+    team_id = team_mapping.get(player_id, {}).get("team_id") if player_id else None
+    if not team_id:
+        return info
+    for game in schedule:
+        if team_id in (game.get("home_team_id"), game.get("away_team_id")):
+            info["home_away"] = "Home" if game.get("home_team_id") == team_id else "Away"
+            info["ballpark"] = game.get("ballpark", "N/A")
+            info["plate_umpire"] = game.get("plate_umpire", "")
+            break
+    return info
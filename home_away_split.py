@@ -24,11 +24,72 @@ from __future__ import annotations
 
 from typing import Dict
 
+from prop_edge import normalize_name
+
 try:
     from pybaseball import batting_stats
 except Exception:
     batting_stats = None  # type: ignore
 
+
+def get_home_away_ratios(season: int | None = None) -> Dict[str, float]:
+    """Return every hitter's home/away batting‑average ratio from one download.
+
+    ``batting_stats`` returns the whole league, so a slate should call this
+    once per season and look players up in the result rather than calling
+    ``get_home_away_multiplier`` per player.
+
+    Parameters
+    ----------
+    season : int, optional
+        Season year to query (defaults to the current year).
+
+    Returns
+    -------
+    dict
+        ``{normalized player name: home AVG / away AVG}`` (see
+        ``prop_edge.normalize_name``).  Hitters with fewer than 30 at‑bats
+        at home or on the road, or without hits in either, are left out.
+        Empty if ``pybaseball`` is unavailable.
+    """
+    if batting_stats is None:
+        # Without pybaseball we cannot compute splits
+        return {}
+    from datetime import datetime
+    current_year = season or datetime.today().year
+    # Fetch batting stats for all players and include split columns
+    df = batting_stats(current_year, qual=1)
+    ratios = {}
+    for _, row in df.iterrows():
+        # pybaseball's batting_stats includes separate columns for home and
+        # away at‑bats and hits: AB_home, H_home, AB_away, H_away
+        h_ab = row.get('AB_home')
+        h_hits = row.get('H_home')
+        a_ab = row.get('AB_away')
+        a_hits = row.get('H_away')
+        if not (h_ab and h_hits and a_ab and a_hits) or h_ab < 30 or a_ab < 30:
+            continue
+        home_avg = h_hits / h_ab
+        away_avg = a_hits / a_ab
+        # Avoid division by zero
+        if home_avg == 0 or away_avg == 0:
+            continue
+        ratios[normalize_name(row['Name'])] = home_avg / away_avg
+    return ratios
+
+
+def home_away_multiplier(ratios: Dict[str, float], player_name: str, is_home: bool) -> float:
+    """Look up a player's multiplier in a table from ``get_home_away_ratios``.
+
+    The ratio is returned when ``is_home`` is True and its reciprocal
+    otherwise; players missing from the table get 1.0.
+    """
+    ratio = ratios.get(normalize_name(player_name))
+    if not ratio:
+        return 1.0
+    return ratio if is_home else (1 / ratio)
+
+
 def get_home_away_multiplier(player_name: str, is_home: bool, season: int | None = None) -> float:
     """Return a performance multiplier based on a player's home/away split.
 
@@ -39,6 +100,9 @@ def get_home_away_multiplier(player_name: str, is_home: bool, season: int | None
     otherwise the reciprocal is returned.  A minimum of 30 at‑bats is
     required on both home and away samples to compute a meaningful ratio.
 
+    Each call downloads the whole league; for a slate use
+    ``get_home_away_ratios`` once and ``home_away_multiplier`` per player.
+
     Parameters
     ----------
     player_name : str
@@ -57,31 +121,7 @@ def get_home_away_multiplier(player_name: str, is_home: bool, season: int | None
         means they perform about 5% worse.  If data is unavailable
         the function returns 1.0.
     """
-    if batting_stats is None:
-        # Without pybaseball we cannot compute splits
-        return 1.0
     try:
-        from datetime import datetime
-        current_year = season or datetime.today().year
-        # Fetch batting stats for all players and include split columns
-        df = batting_stats(current_year, qual=1)
-        row = df[df['Name'].str.lower() == player_name.lower()]
-        if row.empty:
-            return 1.0
-        # pybaseball's batting_stats includes separate columns for home and
-        # away at‑bats and hits: AB_home, H_home, AB_away, H_away
-        h_ab = row.iloc[0].get('AB_home')
-        h_hits = row.iloc[0].get('H_home')
-        a_ab = row.iloc[0].get('AB_away')
-        a_hits = row.iloc[0].get('H_away')
-        if not (h_ab and h_hits and a_ab and a_hits) or h_ab < 30 or a_ab < 30:
-            return 1.0
-        home_avg = h_hits / h_ab
-        away_avg = a_hits / a_ab
-        # Avoid division by zero
-        if home_avg == 0 or away_avg == 0:
-            return 1.0
-        ratio = home_avg / away_avg
-        return ratio if is_home else (1 / ratio)
+        return home_away_multiplier(get_home_away_ratios(season), player_name, is_home)
     except Exception:
         return 1.0
@@ -0,0 +1,207 @@
+# lineup_poller.py
+
+"""
+Background poller for lineup, probable pitcher and umpire changes.
+
+Lineups, probable pitchers and scratches settle close to first pitch.
+Instead of clearing every cache and rebuilding through
+``get_today_schedule`` and the 30‑team roster walk, this module polls the
+statsapi schedule endpoint hydrated with ``probablePitcher``, ``lineups``
+and ``officials`` and works out what actually changed per game.
+
+Requests are conditional: the ``ETag`` and ``Last-Modified`` headers of the
+previous response are sent back as ``If-None-Match`` and
+``If-Modified-Since``, so an unchanged slate costs a ``304 Not Modified``
+and no parsing at all.  For every game whose snapshot differs, a delta is
+passed to the ``on_delta`` callback, e.g.::
+
+    {
+        "game_pk": 745123,
+        "changes": {"home_lineup": ([...], [...]), "away_probable": (506433, 808967)},
+        "players": {518692, 506433, ...},
+        "new_game": False,
+        "removed": False,
+    }
+
+Players are identified by MLBAM person ID, so a delta matches the same
+player however the slate spells the name ("Jose Ramirez" vs "José
+Ramírez"); a person without an ID falls back to the accent‑stripped
+lower‑cased name.  ``players`` holds the players whose cached results
+should be invalidated.  Lineup changes affect the added and dropped (scratched)
+hitters plus the opposing probable pitcher; pitcher changes affect the old
+and new pitcher and the opposing lineup; an umpire or venue change affects
+everyone in the game.
+
+The base URL is configurable so the poller can be pointed at a local stub
+server that replays recorded statsapi responses (``tests/replay_stub.py``
+with the schedules in ``tests/fixtures``).
+"""
+
+import threading
+from datetime import datetime
+
+import requests
+
+from game_utils import get_plate_umpire
+from prop_edge import normalize_name
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from pytz import timezone as ZoneInfo
+
+STATSAPI_BASE_URL = "https://statsapi.mlb.com"
+SCHEDULE_HYDRATE = "probablePitcher,lineups,officials"
+
+
+def _person(person):
+    person = person or {}
+    return person.get("id") or normalize_name(person.get("fullName", ""))
+
+
+def parse_game_snapshot(game):
+    """Reduce a hydrated schedule game to the fields the model depends on."""
+    teams = game.get("teams", {})
+    lineups = game.get("lineups", {})
+    return {
+        "status": game.get("status", {}).get("detailedState", ""),
+        "venue": game.get("venue", {}).get("name", ""),
+        "home_probable": _person(teams.get("home", {}).get("probablePitcher")),
+        "away_probable": _person(teams.get("away", {}).get("probablePitcher")),
+        "home_lineup": [_person(p) for p in lineups.get("homePlayers", [])],
+        "away_lineup": [_person(p) for p in lineups.get("awayPlayers", [])],
+        "plate_umpire": get_plate_umpire(game),
+    }
+
+
+def _everyone(snapshot):
+    players = set(snapshot["home_lineup"]) | set(snapshot["away_lineup"])
+    players.update([snapshot["home_probable"], snapshot["away_probable"]])
+    players.discard("")
+    return players
+
+
+def diff_game(game_pk, old, new):
+    """Return the delta between two snapshots of one game, or None if unchanged."""
+    if old == new:
+        return None
+    if old is None or new is None:
+        return {
+            "game_pk": game_pk,
+            "changes": {},
+            "players": _everyone(old or new),
+            "new_game": old is None,
+            "removed": new is None,
+        }
+
+    changes = {field: (old[field], new[field]) for field in new if old.get(field) != new[field]}
+    players = set()
+    if "venue" in changes or "plate_umpire" in changes:
+        players |= _everyone(old) | _everyone(new)
+    for side, other in (("home", "away"), ("away", "home")):
+        if f"{side}_lineup" in changes:
+            before, after = set(old[f"{side}_lineup"]), set(new[f"{side}_lineup"])
+            players |= before ^ after
+            players.add(new[f"{other}_probable"])
+        if f"{side}_probable" in changes:
+            players.update([old[f"{side}_probable"], new[f"{side}_probable"]])
+            players |= set(new[f"{other}_lineup"])
+    players.discard("")
+    return {
+        "game_pk": game_pk,
+        "changes": changes,
+        "players": players,
+        "new_game": False,
+        "removed": False,
+    }
+
+
+class DeltaPoller:
+    """Poll the hydrated schedule and report per‑game deltas to ``on_delta``."""
+
+    def __init__(self, on_delta, interval=60, base_url=STATSAPI_BASE_URL, session=None, timeout=10):
+        self.on_delta = on_delta
+        self.interval = interval
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.snapshots = {}
+        self._etag = None
+        self._last_modified = None
+        self._date = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _today(self):
+        try:
+            return datetime.now(ZoneInfo("America/Los_Angeles")).date().isoformat()
+        except Exception:
+            return datetime.utcnow().date().isoformat()
+
+    def fetch(self, date=None):
+        """Fetch the schedule for ``date``; return parsed JSON or None if not modified."""
+        date = date or self._today()
+        if date != self._date:
+            # A new slate: validators from yesterday's response do not apply
+            self._date = date
+            self._etag = self._last_modified = None
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        resp = self.session.get(
+            f"{self.base_url}/api/v1/schedule",
+            params={"sportId": 1, "date": date, "hydrate": SCHEDULE_HYDRATE},
+            headers=headers,
+            timeout=self.timeout,
+        )
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        self._etag = resp.headers.get("ETag")
+        self._last_modified = resp.headers.get("Last-Modified")
+        return resp.json()
+
+    def poll_once(self, date=None):
+        """Run one poll cycle and return the list of deltas that were emitted."""
+        data = self.fetch(date)
+        if data is None:
+            return []
+
+        current = {}
+        for date_entry in data.get("dates", []):
+            for game in date_entry.get("games", []):
+                current[game["gamePk"]] = parse_game_snapshot(game)
+
+        deltas = []
+        for game_pk in set(self.snapshots) | set(current):
+            delta = diff_game(game_pk, self.snapshots.get(game_pk), current.get(game_pk))
+            if delta is not None:
+                deltas.append(delta)
+        self.snapshots = current
+
+        for delta in deltas:
+            self.on_delta(delta)
+        return deltas
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception:
+                # Network hiccups should not kill the poller; try again next cycle
+                pass
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start polling on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="delta-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.timeout)
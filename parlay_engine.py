@@ -0,0 +1,260 @@
+# parlay_engine.py
+
+"""
+Correlated multi‑leg parlay evaluator.
+
+Multiplying single‑leg probabilities treats every leg as independent, which
+is wrong for same‑game entries: two hitters on the same team tend to go over
+together, and a pitcher's strikeout over tends to go with the opposing
+hitters going under.  This module simulates joint outcomes per game and
+searches 2–6 leg entries on the simulated trials.
+
+Simulation
+----------
+
+For every game ``n_trials`` draws are made of a shared game factor and one
+factor per team (home/away).  Each leg's latent score is
+
+    L = w_game * s * Z_game + w_team * s * Z_team + sqrt(1 - w_game² - w_team²) * eps
+
+where ``s`` is the leg's direction from ``MARKET_DIRECTION`` (flipped for an
+"under" lean).  Hitter markets load on their own team's factor; pitcher
+markets load on the *opposing* team's factor.  The leg hits when ``L`` falls
+in the upper ``p`` tail of a standard normal, so each leg keeps its model
+probability ``p`` while legs in the same game share draws.  Legs in
+different games use independent draws.
+
+Search
+------
+
+The hit matrix (legs × trials) is searched with a beam over leg count.  All
+one‑leg extensions of every beam entry are counted at once with a single
+matrix product.  Adding a leg can never raise the joint probability, so a
+partial entry whose ``joint_prob * best remaining payout`` cannot beat the
+current N‑th best EV is pruned.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from factor_planner import normalize_market
+
+# +1: the leg benefits from a high-scoring environment for the team it loads on
+MARKET_DIRECTION = {
+    "hits": 1,
+    "total bases": 1,
+    "home runs": 1,
+    "runs": 1,
+    "rbis": 1,
+    "hits + runs + rbis": 1,
+    "singles": 1,
+    "doubles": 1,
+    "walks": 1,
+    "stolen bases": 0,
+    "strikeouts": -1,
+    "pitcher strikeouts": -1,
+    "pitching outs": -1,
+    "hits allowed": 1,
+    "earned runs": 1,
+    "earned runs allowed": 1,
+    "walks allowed": 1,
+}
+
+PITCHER_MARKETS = {
+    "pitcher strikeouts",
+    "pitching outs",
+    "hits allowed",
+    "earned runs",
+    "earned runs allowed",
+    "walks allowed",
+}
+
+# Power-play style payout multipliers by number of legs (all legs must hit)
+DEFAULT_PAYOUTS = {2: 3.0, 3: 5.0, 4: 10.0, 5: 20.0, 6: 37.5}
+
+GAME_WEIGHT = 0.2
+TEAM_WEIGHT = 0.35
+
+
+def legs_from_results(results, min_prob=0.5):
+    """Build parlay legs from evaluation result records.
+
+    Rows without a usable evaluation (``Note`` set) or with a probability
+    below ``min_prob`` are skipped.  The leg probability is ``Edge + 0.5``,
+    i.e. the probability ``evaluate_prop_v2`` gives the row's side winning at
+    its line, so an under leg carries its own (under) marginal.
+    """
+    legs = []
+    for row in results:
+        if row.get("Note"):
+            continue
+        prob = float(row.get("Edge", -1)) + 0.5
+        if prob < min_prob:
+            continue
+        legs.append({
+            "player": row.get("Player", ""),
+            "prop": row.get("Prop", ""),
+            "line": row.get("Line"),
+            "side": str(row.get("Side", "")).lower(),
+            "prob": min(prob, 0.99),
+            "game": row.get("Ballpark", "N/A"),
+            "home_away": row.get("Home/Away", "N/A"),
+        })
+    return legs
+
+
+def simulate_hits(legs, n_trials=10000, seed=0, game_weight=GAME_WEIGHT, team_weight=TEAM_WEIGHT):
+    """Return a boolean ``(len(legs), n_trials)`` matrix of simulated leg hits."""
+    rng = np.random.default_rng(seed)
+    idio_weight = np.sqrt(max(0.0, 1.0 - game_weight ** 2 - team_weight ** 2))
+    hits = np.empty((len(legs), n_trials), dtype=bool)
+    factors = {}
+
+    for i, leg in enumerate(legs):
+        game = leg["game"]
+        if game in ("", "N/A", None):
+            # Unknown game: give the leg its own independent factors
+            game = ("leg", i)
+        if game not in factors:
+            factors[game] = {
+                "game": rng.standard_normal(n_trials),
+                "Home": rng.standard_normal(n_trials),
+                "Away": rng.standard_normal(n_trials),
+            }
+        f = factors[game]
+
+        market = normalize_market(leg["prop"])
+        direction = MARKET_DIRECTION.get(market, 0)
+        if leg["side"] == "under":
+            direction = -direction
+        team = leg["home_away"] if leg["home_away"] in ("Home", "Away") else None
+        if team and market in PITCHER_MARKETS:
+            team = "Away" if team == "Home" else "Home"
+
+        latent = idio_weight * rng.standard_normal(n_trials)
+        if direction:
+            latent += direction * game_weight * f["game"]
+            if team:
+                latent += direction * team_weight * f[team]
+            else:
+                latent += direction * team_weight * rng.standard_normal(n_trials)
+        else:
+            latent += np.sqrt(game_weight ** 2 + team_weight ** 2) * rng.standard_normal(n_trials)
+
+        threshold = NormalDist().inv_cdf(1.0 - leg["prob"])
+        hits[i] = latent > threshold
+    return hits
+
+
+def search_parlays(legs, hits, min_legs=2, max_legs=6, top_n=20, beam_width=200,
+                   payouts=None):
+    """Return the ``top_n`` entries by expected value found by pruned beam search.
+
+    Each entry is a dict with ``legs`` (indices into ``legs``), ``joint_prob``
+    (from the simulated trials), ``independent_prob`` (product of marginals),
+    ``payout`` and ``ev`` (expected profit per unit staked).
+    """
+    payouts = payouts or DEFAULT_PAYOUTS
+    max_legs = min(max_legs, max(payouts), len(legs))
+    if max_legs < min_legs:
+        return []
+    n_trials = hits.shape[1]
+    hits_f = hits.astype(np.float32)
+    players = [leg["player"] for leg in legs]
+    marginals = np.array([leg["prob"] for leg in legs])
+
+    # Best payout reachable from a partial entry of k legs
+    best_remaining = {k: max(payouts.get(n, 0.0) for n in range(max(k, min_legs), max_legs + 1))
+                      for k in range(1, max_legs + 1)}
+
+    player_ids = {name: k for k, name in enumerate(dict.fromkeys(players))}
+    player_of = np.array([player_ids[name] for name in players])
+
+    best = []
+    floor = -1.0
+    first = [int(i) for i in np.argsort(-marginals)[:beam_width]]
+    beam = [(i,) for i in first]
+    masks = hits_f[first].T
+
+    for size in range(2, max_legs + 1):
+        # counts[j, b] = trials where every leg of beam[b] and leg j all hit
+        counts = hits_f @ masks
+        # A player may appear only once per entry
+        beam_players = player_of[np.array(beam)]
+        counts[(player_of[:, None, None] == beam_players[None, :, :]).any(axis=2)] = 0
+        joint = counts / n_trials
+        joint[joint * best_remaining[size] - 1.0 <= floor] = 0
+
+        # Only the strongest extensions can enter the next beam or the top N;
+        # each new entry can be reached from up to ``size`` parents.
+        flat = joint.ravel()
+        keep = min(flat.size, (beam_width + top_n) * size)
+        order = np.argpartition(-flat, keep - 1)[:keep]
+        order = order[np.argsort(-flat[order], kind="stable")]
+
+        candidates = []
+        seen = set()
+        for idx in order:
+            if flat[idx] <= 0:
+                break
+            j, b = divmod(int(idx), len(beam))
+            new = tuple(sorted(beam[b] + (j,)))
+            if new not in seen:
+                seen.add(new)
+                candidates.append((float(flat[idx]), new, b, j))
+
+        if size >= min_legs and size in payouts:
+            for p, combo, _, _ in candidates[:top_n]:
+                ev = p * payouts[size] - 1.0
+                if len(best) < top_n or ev > floor:
+                    best.append({
+                        "legs": list(combo),
+                        "joint_prob": p,
+                        "independent_prob": float(np.prod(marginals[list(combo)])),
+                        "payout": payouts[size],
+                        "ev": float(ev),
+                    })
+            best.sort(key=lambda e: -e["ev"])
+            del best[top_n:]
+            if len(best) == top_n:
+                floor = best[-1]["ev"]
+
+        if size == max_legs:
+            break
+        survivors = [c for c in candidates[:beam_width] if c[0] * best_remaining[size + 1] - 1.0 > floor]
+        if not survivors:
+            break
+        beam = [c[1] for c in survivors]
+        masks = masks[:, [c[2] for c in survivors]] * hits_f[[c[3] for c in survivors]].T
+
+    return best
+
+
+def top_parlays(results, min_legs=2, max_legs=6, top_n=20, n_trials=10000, seed=0,
+                payouts=None, min_prob=0.5):
+    """Evaluate correlated parlays for a slate of evaluation results.
+
+    Returns a list of dicts ready for display: a readable ``Legs`` label,
+    ``Legs #``, simulated ``Joint %``, ``Independent %``, ``Payout`` and
+    ``EV``.
+    """
+    legs = legs_from_results(results, min_prob=min_prob)
+    if len(legs) < min_legs:
+        return []
+    hits = simulate_hits(legs, n_trials=n_trials, seed=seed)
+    entries = search_parlays(legs, hits, min_legs=min_legs, max_legs=max_legs,
+                             top_n=top_n, payouts=payouts)
+    rows = []
+    for entry in entries:
+        labels = [f"{legs[i]['player']} {legs[i]['side'].title()} {legs[i]['line']} {legs[i]['prop']}"
+                  for i in entry["legs"]]
+        rows.append({
+            "Legs": " | ".join(labels),
+            "Legs #": len(entry["legs"]),
+            "Joint %": round(entry["joint_prob"] * 100, 1),
+            "Independent %": round(entry["independent_prob"] * 100, 1),
+            "Payout": entry["payout"],
+            "EV": round(entry["ev"], 3),
+        })
+    return rows
@@ -0,0 +1,197 @@
+# prop_distribution.py
+
+"""
+Outcome distributions for player props and vectorized line lookups.
+
+Shopping eight alternate lines should not mean eight evaluations.  This
+module builds the full distribution of a player's outcome count once from
+the resolved factors, after which the probability for any number of lines
+is an array index into the CDF.  ``evaluate_prop_v2`` uses it to price the
+offered line and side of every prop.
+
+Model
+-----
+
+The book's main line for a player and market already prices the player:
+it is set so that over and under are a coin flip.  The baseline mean is
+therefore fitted to the main line (``fit_mean``), so that with neutral
+factors P(over) = P(under) there.  Without a main line the league‑average
+mean per game (``MARKET_BASELINE_MEAN``) is used instead.  The baseline is
+scaled by the product of the prop's resolved factor multipliers (see
+``factor_planner``) and the count is modelled as Poisson:
+
+    pmf[k] = exp(-mu) * mu**k / k!
+
+Alternate lines are priced from that one distribution.  Lines are compared
+the usual way: over 1.5 needs at least 2, over 2 needs at least 3 (and 2 is
+a push), under 1.5 needs at most 1.
+
+Example
+-------
+
+>>> dist = outcome_distribution("Pitcher Strikeouts", {"umpire": 1.08})
+>>> prob_over(dist, [4.5, 5.5, 6.5])
+array([0.70683204, 0.54463544, 0.3840608 ])
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from factor_planner import normalize_market
+
+# League-average count per player per game
+MARKET_BASELINE_MEAN = {
+    "hits": 0.9,
+    "singles": 0.6,
+    "doubles": 0.18,
+    "total bases": 1.4,
+    "runs": 0.5,
+    "rbis": 0.5,
+    "hits + runs + rbis": 1.9,
+    "home runs": 0.13,
+    "walks": 0.35,
+    "strikeouts": 0.95,
+    "stolen bases": 0.07,
+    "pitcher strikeouts": 5.5,
+    "pitching outs": 16.0,
+    "hits allowed": 5.3,
+    "earned runs": 2.6,
+    "earned runs allowed": 2.6,
+    "walks allowed": 1.9,
+}
+
+DEFAULT_BASELINE_MEAN = 1.0
+
+# Half-lines shown in the per-prop curve (odd, so the offered line is the middle one)
+CURVE_POINTS = 7
+
+
+def _poisson_cdf(k, mu):
+    """P(X <= k) for X ~ Poisson(mu), with plain floats."""
+    if k < 0:
+        return 0.0
+    term = total = math.exp(-mu)
+    for i in range(1, int(k) + 1):
+        term *= mu / i
+        total += term
+    return min(total, 1.0)
+
+
+@lru_cache(maxsize=1024)
+def fit_mean(line):
+    """Return the Poisson mean at which over and under ``line`` are equally likely.
+
+    Returns None for lines without an under (below 0.5).
+    """
+    over_below = int(math.floor(line))      # over needs more than this
+    under_above = int(math.ceil(line)) - 1  # under needs at most this
+    if under_above < 0:
+        return None
+    lo, hi = 1e-6, line + 10 * math.sqrt(line + 1) + 10
+    # P(over) - P(under) increases with mu; bisect for the crossing
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if (1.0 - _poisson_cdf(over_below, mid)) < _poisson_cdf(under_above, mid):
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def outcome_distribution(prop_type, factors=None, main_line=None):
+    """Return the outcome‑count distribution for a prop.
+
+    Parameters
+    ----------
+    prop_type : str
+        Market name (e.g. ``"Total Bases"``).
+    factors : dict, optional
+        ``{factor: multiplier}`` as returned by
+        ``factor_planner.resolve_factors``.  Missing means neutral.
+    main_line : float, optional
+        The player's main line in this market.  The baseline mean is fitted
+        so that it is a coin flip; without it the league‑average mean for
+        the market is used.
+
+    Returns
+    -------
+    dict
+        ``mean`` (float), ``pmf`` and ``cdf`` (numpy arrays indexed by count).
+        The last CDF entry is 1.0, so counts beyond the array are covered.
+    """
+    mu = fit_mean(float(main_line)) if main_line is not None else None
+    if mu is None:
+        mu = MARKET_BASELINE_MEAN.get(normalize_market(prop_type), DEFAULT_BASELINE_MEAN)
+    for mult in (factors or {}).values():
+        mu *= mult
+    mu = max(mu, 1e-6)
+
+    max_count = int(math.ceil(mu + 10 * math.sqrt(mu) + 10))
+    ratios = np.empty(max_count + 1)
+    ratios[0] = math.exp(-mu)
+    ratios[1:] = mu / np.arange(1, max_count + 1)
+    pmf = np.cumprod(ratios)
+    cdf = np.cumsum(pmf)
+    cdf[-1] = 1.0
+    return {"mean": mu, "pmf": pmf, "cdf": cdf}
+
+
+@lru_cache(maxsize=4096)
+def cached_distribution(prop_type, factor_items=(), main_line=None):
+    """``outcome_distribution`` memoized on ``tuple(sorted(factors.items()))``.
+
+    Every line offered for the same player and market (same factors, same
+    main line) shares one distribution.  The returned arrays are shared and
+    must not be modified.
+    """
+    return outcome_distribution(prop_type, dict(factor_items), main_line)
+
+
+def _cdf_at(dist, counts):
+    """P(X <= counts) for an array of integer counts (negative -> 0)."""
+    cdf = dist["cdf"]
+    idx = np.clip(counts, -1, len(cdf) - 1)
+    return np.where(idx < 0, 0.0, cdf[np.maximum(idx, 0)])
+
+
+def prob_over(dist, lines):
+    """P(outcome > line) for every line in ``lines`` (pushes count as losses)."""
+    lines = np.asarray(lines, dtype=float)
+    return 1.0 - _cdf_at(dist, np.floor(lines).astype(int))
+
+
+def prob_under(dist, lines):
+    """P(outcome < line) for every line in ``lines`` (pushes count as losses)."""
+    lines = np.asarray(lines, dtype=float)
+    return _cdf_at(dist, np.ceil(lines).astype(int) - 1)
+
+
+def prob_side(dist, lines, side):
+    """P(the ``side`` ("over" or "under") wins) for every line in ``lines``."""
+    if str(side).lower() == "under":
+        return prob_under(dist, lines)
+    return prob_over(dist, lines)
+
+
+def curve_lines(center, points=CURVE_POINTS):
+    """Return ``points`` consecutive half‑lines centred on ``center`` (e.g. the offered line).
+
+    The window is shifted up rather than going below 0.5.
+    """
+    start = max(0, int(math.floor(center)) - points // 2)
+    return np.arange(start, start + points) + 0.5
+
+
+def implied_probability(american_odds):
+    """Convert American odds (e.g. ``-120`` or ``+150``) to an implied probability."""
+    try:
+        odds = float(american_odds)
+    except (TypeError, ValueError):
+        return None
+    if odds < 0:
+        return -odds / (-odds + 100.0)
+    if odds > 0:
+        return 100.0 / (odds + 100.0)
+    return None
@@ -1,10 +1,18 @@
 # prop_edge.py
 
+import unicodedata
+
 import requests
 
+def normalize_name(player_name):
+    """Lower-case a player name and strip accents ("José Ramírez" -> "jose ramirez")."""
+    decomposed = unicodedata.normalize("NFKD", str(player_name).strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
 def get_player_id(player_name, roster_mapping):
     """Return MLBAM player ID for a given name using roster or fallback."""
-    key = player_name.strip().lower()
+    key = normalize_name(player_name)
     if key in roster_mapping:
         return roster_mapping[key]
 
@@ -41,7 +49,7 @@ def build_roster_mapping():
             )
             for player in roster_resp.json().get("roster", []):
                 pid = player.get("person", {}).get("id")
-                name = player.get("person", {}).get("fullName", "").lower()
+                name = normalize_name(player.get("person", {}).get("fullName", ""))
                 if pid and name:
                     mapping[name] = pid
         except Exception:
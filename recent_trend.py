@@ -4,35 +4,49 @@ from pybaseball import batting_stats_range, statcast_batter, statcast_pitcher
 from datetime import datetime, timedelta
 import pandas as pd
 
+from prop_edge import normalize_name
 
-def get_recent_trend_multiplier(player_name: str, long_days: int = 15, short_days: int = 5) -> float:
+
+def trend_windows(long_days: int = 15, short_days: int = 5) -> tuple:
     """
-    Compares recent short-term (e.g. 5-day) batting average to longer-term (e.g. 15-day) average.
-    Returns a multiplier to adjust projections based on 'heating up' or 'cooling down'.
+    Returns the (long_start, short_start, end) dates, as 'YYYY-MM-DD' strings,
+    of the windows compared by the recent trend, ending today.
     """
-    try:
-        today = datetime.today()
-        long_start = today - timedelta(days=long_days)
-        short_start = today - timedelta(days=short_days)
-
-        long_df = batting_stats_range(long_start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
-        short_df = batting_stats_range(short_start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
+    today = datetime.today()
+    long_start = today - timedelta(days=long_days)
+    short_start = today - timedelta(days=short_days)
+    return long_start.strftime('%Y-%m-%d'), short_start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
 
-        long_row = long_df[long_df['Name'].str.lower() == player_name.lower()]
-        short_row = short_df[short_df['Name'].str.lower() == player_name.lower()]
 
-        if long_row.empty or short_row.empty:
-            return 1.0
-
-        long_avg = long_row['AVG'].values[0]
-        short_avg = short_row['AVG'].values[0]
+def get_recent_trend_ratios(long_start: str, short_start: str, end: str) -> dict:
+    """
+    Returns {normalized player name: short-window AVG / long-window AVG} for the whole league.
+    batting_stats_range is league-wide, so a slate downloads each window once and
+    looks every player up in the result.
+    """
+    long_df = batting_stats_range(long_start, end)
+    short_df = batting_stats_range(short_start, end)
 
-        if pd.isna(long_avg) or pd.isna(short_avg) or long_avg == 0:
-            return 1.0
+    long_avgs = {normalize_name(name): avg for name, avg in zip(long_df['Name'], long_df['AVG'])}
+    ratios = {}
+    for name, short_avg in zip(short_df['Name'], short_df['AVG']):
+        key = normalize_name(name)
+        long_avg = long_avgs.get(key)
+        if long_avg is None or pd.isna(long_avg) or pd.isna(short_avg) or long_avg == 0:
+            continue
+        ratios[key] = round(short_avg / long_avg, 2)
+    return ratios
 
-        ratio = short_avg / long_avg
-        return round(ratio, 2)
 
+def get_recent_trend_multiplier(player_name: str, long_days: int = 15, short_days: int = 5) -> float:
+    """
+    Compares recent short-term (e.g. 5-day) batting average to longer-term (e.g. 15-day) average.
+    Returns a multiplier to adjust projections based on 'heating up' or 'cooling down'.
+    For a whole slate, call get_recent_trend_ratios once instead.
+    """
+    try:
+        ratios = get_recent_trend_ratios(*trend_windows(long_days, short_days))
+        return ratios.get(normalize_name(player_name), 1.0)
     except Exception:
         return 1.0
 
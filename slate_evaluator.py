@@ -0,0 +1,242 @@
+# slate_evaluator.py
+
+"""
+Batch evaluation engine for an uploaded prop slate.
+
+This is the loop that used to live inline in ``streamlit_app.py``.  It is
+kept free of Streamlit so that both the app and the local evaluation
+service (``eval_service.py``) can run exactly the same code.  Rows are
+plain dictionaries using the RotoWire CSV column names (``Player``,
+``Market Name``, ``Lean``, ``Line``).
+"""
+
+import csv
+import io
+import math
+
+from prop_edge import get_player_id, build_roster_mapping, normalize_name
+from game_utils import (
+    build_player_team_mapping,
+    get_today_schedule,
+    get_game_info_for_player
+)
+from evaluate_prop_v2 import evaluate_prop_v2
+from factor_planner import plan_fetches, execute_plan, resolve_factors, fetch_factor
+from prop_distribution import cached_distribution, prob_over, curve_lines, implied_probability
+
+
+def load_reference_data():
+    """Fetch the roster, team and schedule lookups used by every row."""
+    roster_mapping = build_roster_mapping()
+    team_mapping = build_player_team_mapping()
+    schedule_today = get_today_schedule()
+    return roster_mapping, team_mapping, schedule_today
+
+
+def parse_slate_csv(data):
+    """Parse raw CSV bytes (or text) into a list of row dictionaries."""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    return [dict(row) for row in csv.DictReader(io.StringIO(data))]
+
+
+def _parse_line(line_val):
+    try:
+        line = float(line_val)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(line) else line
+
+
+def row_key(row):
+    """Return a hashable key identifying the inputs of a single prop row."""
+    return (
+        normalize_name(row.get("Player", "") or ""),
+        str(row.get("Market Name", "") or "").strip(),
+        str(row.get("Lean", "") or "").strip().lower(),
+        _parse_line(row.get("Line")),
+        str(row.get("Odds", row.get("Price")) or "").strip(),
+    )
+
+
+def prepare_row(row, roster_mapping, team_mapping, schedule_today):
+    """Resolve the player and game for one slate row.
+
+    Returns the prop context used by ``factor_planner`` plus the fields
+    needed to build the result record.  A failed player or game lookup is
+    recorded in ``ctx["note"]`` instead of raising, so one bad row cannot
+    fail the whole slate.
+    """
+    name = str(row.get("Player", "") or "").strip()
+    prop_type = str(row.get("Market Name", "") or "").strip()
+    side = str(row.get("Lean", "") or "").strip().lower()
+    ctx = {
+        "player_name": name,
+        "prop_type": prop_type,
+        "side": side,
+        "line": _parse_line(row.get("Line")),
+        "player_id": None,
+        "is_home": False,
+        "ballpark": "N/A",
+        "home_away": "N/A",
+        "umpire": row.get("Umpire") or None,
+        "price": row.get("Odds", row.get("Price")),
+        "main_line": None,
+        "note": "",
+    }
+
+    try:
+        # Get player ID
+        pid = get_player_id(name, roster_mapping)
+        if pid:
+            # Get game info (home/away, ballpark, plate umpire)
+            info = get_game_info_for_player(name, roster_mapping, team_mapping, schedule_today)
+            ctx["player_id"] = pid
+            ctx["home_away"] = info.get("home_away", "N/A")
+            ctx["ballpark"] = info.get("ballpark", "N/A")
+            ctx["is_home"] = ctx["home_away"] == "Home"
+            ctx["umpire"] = ctx["umpire"] or info.get("plate_umpire") or None
+    except Exception as e:
+        ctx["player_id"] = None
+        ctx["note"] = f"⚠️ Lookup failed: {str(e)}"
+    return ctx
+
+
+def evaluate_prepared(ctx, factors=None):
+    """Evaluate a row prepared by ``prepare_row`` and return its result record."""
+    # Default output values
+    prob, prob_val, conf, rec = 0.0, 0, "N/A", "❌"
+    note = ""
+    edge = -1
+    curve, curve_range, price_edge = None, None, None
+
+    if ctx.get("note"):
+        note = ctx["note"]
+    elif not ctx["player_id"]:
+        note = "❌ Player ID not found"
+    else:
+        try:
+            prob, prob_val, conf, rec, edge = evaluate_prop_v2(
+                player_name=ctx["player_name"],
+                prop_type=ctx["prop_type"],
+                line=ctx["line"],
+                side=ctx["side"],
+                is_home=ctx["is_home"],
+                ballpark=ctx["ballpark"],
+                player_id=ctx["player_id"],
+                umpire=ctx["umpire"],
+                factors=factors,
+                main_line=ctx["main_line"]
+            )
+            # prob is already line- and side-aware; compare it with the price
+            if ctx["line"] is not None:
+                implied = implied_probability(ctx["price"])
+                price_edge = round(prob - (implied if implied is not None else 0.5), 4)
+            # The same distribution evaluate_prop_v2 priced the line from
+            main_line = ctx["main_line"] if ctx["main_line"] is not None else ctx["line"]
+            dist = cached_distribution(ctx["prop_type"], tuple(sorted((factors or {}).items())), main_line)
+            lines = curve_lines(ctx["line"] if ctx["line"] is not None else dist["mean"])
+            curve = [round(float(p), 3) for p in prob_over(dist, lines)]
+            curve_range = f"{lines[0]:g}–{lines[-1]:g}"
+        except Exception as e:
+            prob, prob_val, conf, rec, edge = 0.0, 0, "N/A", "❌", -1
+            curve, curve_range, price_edge = None, None, None
+            note = f"⚠️ Eval failed: {str(e)}"
+
+    side = ctx["side"]
+    return {
+        "Player": ctx["player_name"],
+        "Prop": ctx["prop_type"] or "N/A",
+        "Line": ctx["line"],
+        "Side": side.title() if side else "N/A",
+        "Prob %": f"{prob_val:.1f}%" if prob_val else "N/A",
+        "Confidence": conf,
+        "Recommendation": rec,
+        "Ballpark": ctx["ballpark"],
+        "Home/Away": ctx["home_away"],
+        "Edge": edge,
+        "Price Edge": price_edge,
+        "Curve": curve,
+        "Curve Lines": curve_range,
+        "Note": note
+    }
+
+
+def annotate_best_lines(results):
+    """Add a ``Best Line`` column: per player/market/side, the offered line
+    with the highest ``Price Edge`` (line probability minus the implied
+    probability of its price, or minus 0.5 when no price was given).
+
+    Returns new records; the inputs are not modified.
+    """
+    best = {}
+    for row in results:
+        if row.get("Price Edge") is None:
+            continue
+        group = (row["Player"].lower(), row["Prop"], row["Side"])
+        if group not in best or row["Price Edge"] > best[group]["Price Edge"]:
+            best[group] = row
+    annotated = []
+    for row in results:
+        chosen = best.get((row["Player"].lower(), row["Prop"], row["Side"]))
+        annotated.append(dict(row, **{"Best Line": chosen["Line"] if chosen else None}))
+    return annotated
+
+
+def main_lines(rows):
+    """Return the main line of each row's player and market, in row order.
+
+    The main line is the offered line whose price is closest to even money;
+    when none of the player's lines in that market is priced it is the
+    median offered line.  Rows without a line get None.
+    """
+    offers = {}
+    for row in rows:
+        line = _parse_line(row.get("Line"))
+        if line is not None:
+            implied = implied_probability(row.get("Odds", row.get("Price")))
+            offers.setdefault(row_key(row)[:2], []).append((line, implied))
+    mains = {}
+    for group, group_offers in offers.items():
+        priced = [(abs(implied - 0.5), line) for line, implied in group_offers if implied is not None]
+        if priced:
+            mains[group] = min(priced)[1]
+        else:
+            lines = sorted({line for line, _ in group_offers})
+            mains[group] = lines[(len(lines) - 1) // 2]
+    return [mains.get(row_key(row)[:2]) for row in rows]
+
+
+def evaluate_row(row, roster_mapping, team_mapping, schedule_today, fetch=fetch_factor, main_line=None):
+    """Evaluate one slate row and return the result record shown in the app.
+
+    ``fetch`` is passed to ``factor_planner.execute_plan`` so callers can
+    share factor fetches between rows.  ``main_line`` is the player's main
+    line in the row's market (see ``main_lines``); it defaults to the row's
+    own line.
+    """
+    ctx = prepare_row(row, roster_mapping, team_mapping, schedule_today)
+    ctx["main_line"] = main_line
+    factors = None
+    if ctx["player_id"]:
+        factors = resolve_factors(ctx, execute_plan(plan_fetches([ctx]), fetch))
+    return evaluate_prepared(ctx, factors)
+
+
+def evaluate_slate(rows, roster_mapping, team_mapping, schedule_today, fetch=fetch_factor):
+    """Evaluate every row of a slate in order and return the result records.
+
+    Factor fetches are planned for the whole slate first, so a factor shared
+    by several props (e.g. the weather at one ballpark) is fetched once and
+    factors irrelevant to a prop's market are never fetched.  Every line of
+    a player's market is priced from one distribution fitted to its main
+    line.
+    """
+    contexts = [prepare_row(row, roster_mapping, team_mapping, schedule_today) for row in rows]
+    for ctx, main_line in zip(contexts, main_lines(rows)):
+        ctx["main_line"] = main_line
+    resolved = execute_plan(plan_fetches(ctx for ctx in contexts if ctx["player_id"]), fetch)
+    return annotate_best_lines([
+        evaluate_prepared(ctx, resolve_factors(ctx, resolved) if ctx["player_id"] else None)
+        for ctx in contexts
+    ])
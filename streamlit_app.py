@@ -1,26 +1,109 @@
 # streamlit_app.py
 
+import hashlib
+import uuid
+
+import requests
 import streamlit as st
 import pandas as pd
-from prop_edge import get_player_id, build_roster_mapping
-from game_utils import (
-    build_player_team_mapping,
-    get_today_schedule,
-    get_game_info_for_player
-)
-from evaluate_prop_v2 import evaluate_prop_v2
+from slate_evaluator import load_reference_data, parse_slate_csv, evaluate_slate
+from eval_service import evaluate_slate_remote, service_version
+from parlay_engine import top_parlays
+
+# Evaluated slates are reused across reruns and sessions for this long.  When
+# the evaluation service is running the cache is also keyed on its version
+# for the slate's players, so lineup and probable pitcher changes affecting
+# the slate show up on a later rerun.
+RESULT_TTL = 300
+
+# Filter and sort clicks within this many seconds reuse the last version check
+VERSION_TTL = 15
 
 
-# --- Load Data Once ---
+# --- Load Data Once (only used when the evaluation service is not running) ---
 @st.cache_data
 def load_data():
-    roster_mapping = build_roster_mapping()
-    team_mapping = build_player_team_mapping()
-    schedule_today = get_today_schedule()
-    return roster_mapping, team_mapping, schedule_today
+    return load_reference_data()
+
+
+def run_evaluation(rows, client_id=None):
+    """Evaluate through the shared local service, or in-process if it is not running.
+
+    Only a refused connection falls back; timeouts and service errors are
+    raised so that a slow service is not duplicated by every session.
+    """
+    try:
+        return evaluate_slate_remote(rows, client_id=client_id)
+    except requests.ConnectionError:
+        roster_mapping, team_mapping, schedule_today = load_data()
+        return evaluate_slate(rows, roster_mapping, team_mapping, schedule_today)
 
 
-roster_mapping, team_mapping, schedule_today = load_data()
+@st.cache_data(ttl=RESULT_TTL, show_spinner="Evaluating props...")
+def evaluate_upload(upload_hash, version, _data, _client_id=None):
+    """Evaluate an uploaded CSV once per content hash and service version.
+
+    Underscored arguments are not hashed by ``st.cache_data``.
+    """
+    results = run_evaluation(parse_slate_csv(_data), client_id=_client_id)
+    result_df = pd.DataFrame(results)
+    if not result_df.empty:
+        result_df.sort_values(by="Edge", ascending=False, inplace=True)
+        result_df.reset_index(drop=True, inplace=True)
+    return results, result_df, result_df.to_csv(index=False)
+
+
+@st.cache_data(ttl=RESULT_TTL, show_spinner="Searching parlays...")
+def build_parlays(evaluation_key, min_legs, max_legs, _results):
+    return top_parlays(_results, min_legs=min_legs, max_legs=max_legs)
+
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def slate_version(upload_hash, _data):
+    """Return the service's version for the players in the upload ("local" if it is not running)."""
+    players = sorted({row.get("Player", "") for row in parse_slate_csv(_data)})
+    try:
+        return service_version(players=players)
+    except requests.ConnectionError:
+        return "local"
+
+
+def get_evaluation(data):
+    """Return the cached evaluation for ``data``, keyed by its content hash
+    and the evaluation service's version for the slate's players.
+    """
+    upload_hash = hashlib.sha256(data).hexdigest()
+    version = slate_version(upload_hash, data)
+    client_id = st.session_state.setdefault("client_id", uuid.uuid4().hex)
+    return (f"{upload_hash}:{version}",) + evaluate_upload(upload_hash, version, data, client_id)
+
+
+def filter_results(result_df):
+    """Render filter/sort controls and apply them to the cached result frame."""
+    if result_df.empty:
+        return result_df
+
+    col1, col2, col3, col4 = st.columns(4)
+    # Rows that could not be evaluated carry Edge = -1; the default keeps them visible
+    min_edge = col1.slider("Min edge", -1.0, 0.5, -1.0, 0.01)
+    confidence = col2.multiselect("Confidence", sorted(result_df["Confidence"].unique()))
+    markets = col3.multiselect("Market", sorted(result_df["Prop"].unique()))
+    ballparks = col4.multiselect("Ballpark", sorted(result_df["Ballpark"].unique()))
+    sort_col, order_col = st.columns([3, 1])
+    # "Prob %" style columns are formatted strings; sort on Edge for probability order
+    sortable = [c for c in result_df.columns if not c.startswith("Curve") and not c.endswith("%")]
+    sort_by = sort_col.selectbox("Sort by", sortable, index=sortable.index("Edge"))
+    descending = order_col.checkbox("Descending", value=True)
+
+    mask = result_df["Edge"] >= min_edge
+    if confidence:
+        mask &= result_df["Confidence"].isin(confidence)
+    if markets:
+        mask &= result_df["Prop"].isin(markets)
+    if ballparks:
+        mask &= result_df["Ballpark"].isin(ballparks)
+    return result_df[mask].sort_values(by=sort_by, ascending=not descending, kind="stable")
+
 
 st.set_page_config(page_title="MLB Prop Evaluator", layout="wide")
 st.title("⚾ MLB Prop Bet Evaluator")
@@ -31,66 +114,35 @@ csv_file = st.file_uploader("📤 Upload RotoWire CSV", type=["csv"])
 
 if csv_file:
     st.subheader("📥 Uploaded CSV Evaluation")
-    df = pd.read_csv(csv_file)
-
-    results = []
-
-    for _, row in df.iterrows():
-        name = str(row.get("Player", "")).strip()
-        prop_type = str(row.get("Market Name", "")).strip()
-        side = str(row.get("Lean", "")).strip().lower()
-        line_val = row.get("Line", "")
-        line_float = float(line_val) if pd.notna(line_val) else None
-
-        # Default output values
-        prob, prob_val, conf, rec = 0.0, 0, "N/A", "❌"
-        ballpark, home_away, note = "N/A", "N/A", ""
-        edge = -1
-
-        # Get player ID
-        pid = roster_mapping.get(name.lower()) or get_player_id(name, roster_mapping)
-        if not pid:
-            note = "❌ Player ID not found"
+    try:
+        evaluation_key, results, result_df, result_csv = get_evaluation(csv_file.getvalue())
+    except requests.RequestException as e:
+        st.error(f"⚠️ Evaluation service error: {e}")
+        st.stop()
+
+    view_df = filter_results(result_df)
+    st.caption(f"Showing {len(view_df)} of {len(result_df)} props")
+    st.dataframe(
+        view_df,
+        column_config={
+            "Curve": st.column_config.LineChartColumn(
+                "P(over) by line", y_min=0.0, y_max=1.0,
+                help="P(over) at consecutive half-lines centred on the offered line (see Curve Lines)",
+            ),
+        },
+    )
+
+    st.download_button("📥 Download Full Evaluation", result_csv, file_name="evaluated_props.csv")
+
+    # --- Correlated Parlays ---
+    st.subheader("🎯 Top Parlays (same-game correlation)")
+    min_legs, max_legs = st.slider("Legs per entry", 2, 6, (2, 6))
+    if st.checkbox("Build parlays"):
+        parlays = build_parlays(evaluation_key, min_legs, max_legs, results)
+        if parlays:
+            st.dataframe(pd.DataFrame(parlays))
         else:
-            # Get game info (home/away, ballpark)
-            info = get_game_info_for_player(name, roster_mapping, team_mapping, schedule_today)
-            home_away = info.get("home_away", "N/A")
-            ballpark = info.get("ballpark", "N/A")
-
-            try:
-                prob, prob_val, conf, rec, edge = evaluate_prop_v2(
-                    player_name=name,
-                    prop_type=prop_type,
-                    line=line_float,
-                    side=side,
-                    is_home=(home_away == "Home"),
-                    ballpark=ballpark,
-                    player_id=pid
-                )
-            except Exception as e:
-                note = f"⚠️ Eval failed: {str(e)}"
-
-        results.append({
-            "Player": name,
-            "Prop": prop_type or "N/A",
-            "Line": line_val,
-            "Side": side.title() if side else "N/A",
-            "Prob %": f"{prob_val:.1f}%" if prob_val else "N/A",
-            "Confidence": conf,
-            "Recommendation": rec,
-            "Ballpark": ballpark,
-            "Home/Away": home_away,
-            "Edge": edge,
-            "Note": note
-        })
-
-    # Convert to DataFrame and sort
-    result_df = pd.DataFrame(results)
-    result_df.sort_values(by="Edge", ascending=False, inplace=True)
-
-    st.dataframe(result_df)
-
-    st.download_button("📥 Download Full Evaluation", result_df.to_csv(index=False), file_name="evaluated_props.csv")
+            st.info("Not enough evaluated props with a positive edge to build parlays.")
 
 else:
     st.info("Upload a CSV to begin analysis.")
@@ -0,0 +1,73 @@
+"""Local stand-in for statsapi that replays recorded schedule responses."""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class ReplayStub:
+    """Serve recorded responses one at a time, honouring ``If-None-Match``.
+
+    The current recording is served with an ``ETag`` derived from its
+    position.  A request whose ``If-None-Match`` matches gets ``304 Not
+    Modified``; ``advance()`` moves on to the next recording as if upstream
+    had changed.
+    """
+
+    def __init__(self, fixture_names):
+        self.bodies = []
+        for name in fixture_names:
+            with open(os.path.join(FIXTURES, name), "rb") as f:
+                self.bodies.append(f.read())
+        self.index = 0
+        self.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def etag(self):
+        return f'"schedule-{self.index}"'
+
+    def advance(self):
+        self.index += 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append({"path": self.path, "headers": dict(self.headers)})
+                if self.headers.get("If-None-Match") == stub.etag:
+                    self.send_response(304)
+                    self.send_header("ETag", stub.etag)
+                    self.end_headers()
+                    return
+                body = stub.bodies[stub.index]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", stub.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return json.load(f)
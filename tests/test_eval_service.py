@@ -0,0 +1,132 @@
+import threading
+import time
+
+from eval_service import EvaluationService
+
+
+def make_service():
+    return EvaluationService(workers=1)
+
+
+def row_key(player_id, player, market="Hits"):
+    return ("row", player_id, player, market, "over", 0.5, "", None)
+
+
+def test_apply_delta_removes_only_affected_rows():
+    service = make_service()
+    service.row_results.set(row_key(666969, "nolan jones"), {"Edge": 0.1})
+    service.row_results.set(row_key(605141, "mookie betts"), {"Edge": 0.2})
+    service.slate_results.set(("slate", "abc"), [{"Edge": 0.1}])
+    service.factor_results.set(("home_away", (2026,)), {"nolan jones": 1.04})
+
+    service.apply_delta({
+        "game_pk": 745001,
+        "changes": {"home_lineup": ([], [])},
+        "players": {666969},
+        "new_game": False,
+        "removed": False,
+    })
+
+    assert service.row_results.get(row_key(666969, "nolan jones")) is None
+    assert service.row_results.get(row_key(605141, "mookie betts")) == {"Edge": 0.2}
+    assert service.slate_results.get(("slate", "abc")) is None
+    # League factor tables do not depend on lineups and stay cached
+    assert service.factor_results.get(("home_away", (2026,))) == {"nolan jones": 1.04}
+
+
+def test_umpire_change_reloads_only_the_schedule(monkeypatch):
+    import game_utils
+    import slate_evaluator
+
+    new_schedule = [{"home_team_id": 115, "away_team_id": 119, "ballpark": "Coors Field",
+                     "plate_umpire": "Will Little"}]
+
+    def roster_walk():
+        raise AssertionError("only the schedule should be reloaded")
+
+    monkeypatch.setattr(game_utils, "get_today_schedule", lambda: new_schedule)
+    monkeypatch.setattr(slate_evaluator, "load_reference_data", roster_walk)
+    service = make_service()
+    roster, teams = {"nolan jones": 666969}, {666969: {"team_id": 115}}
+    service._reference = (roster, teams, [])
+    service._reference_loaded = time.monotonic()
+
+    service.apply_delta({
+        "game_pk": 745001,
+        "changes": {"plate_umpire": ("Pat Hoberg", "Will Little")},
+        "players": {666969},
+        "new_game": False,
+        "removed": False,
+    })
+
+    assert service.reference_data() == (roster, teams, new_schedule)
+
+
+def test_accented_player_is_invalidated_by_id():
+    service = make_service()
+    service._reference = ({"jose ramirez": 608070}, {}, [])
+    service._reference_loaded = float("inf")
+    service.row_results.set(row_key(608070, "jose ramirez"), {"Edge": 0.1})
+    row = {"Player": "José Ramírez", "Market Name": "Hits", "Lean": "Over", "Line": "0.5"}
+    assert service.evaluate_row(row) == {"Edge": 0.1}
+
+    service.apply_delta({"game_pk": 745002, "changes": {"home_lineup": ([], [])},
+                         "players": {608070}, "new_game": False, "removed": False})
+
+    assert len(service.row_results._data) == 0
+
+
+def test_in_flight_row_is_not_cached_after_invalidation(monkeypatch):
+    import slate_evaluator
+
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fake_evaluate_row(row, *refs, fetch=None, main_line=None):
+        calls.append(row["Player"])
+        call_number = len(calls)
+        started.set()
+        release.wait(5)
+        return {"Player": row["Player"], "Edge": call_number}
+
+    monkeypatch.setattr(slate_evaluator, "evaluate_row", fake_evaluate_row)
+    service = make_service()
+    service._reference = ({"nolan jones": 666969}, {}, [])
+    service._reference_loaded = float("inf")
+    row = {"Player": "Nolan Jones", "Market Name": "Hits", "Lean": "Over", "Line": "0.5"}
+
+    results = {}
+    before = threading.Thread(target=lambda: results.setdefault("before", service.evaluate_row(row)))
+    before.start()
+    started.wait(5)
+    service.invalidate_players({666969})
+    # A request after the delta must not join the stale in-flight call
+    after = threading.Thread(target=lambda: results.setdefault("after", service.evaluate_row(row)))
+    after.start()
+    release.set()
+    before.join(5)
+    after.join(5)
+
+    assert calls == ["Nolan Jones", "Nolan Jones"]
+    assert results["before"]["Edge"] != results["after"]["Edge"]
+    # Only the post-delta result is cached
+    assert list(service.row_results._data.values())[0][1] == results["after"]
+
+
+def test_version_changes_on_invalidation():
+    service = make_service()
+    before = service.version
+    service.invalidate_players({666969})
+    assert service.version != before
+
+
+def test_slate_version_ignores_other_players():
+    service = make_service()
+    service._player_ids = {"jose ramirez": 608070}
+    before = service.slate_version(["José Ramírez", "Nolan Jones"])
+
+    service.invalidate_players({605141})
+    assert service.slate_version(["José Ramírez", "Nolan Jones"]) == before
+
+    service.invalidate_players({608070})
+    assert service.slate_version(["José Ramírez", "Nolan Jones"]) != before
@@ -0,0 +1,48 @@
+import factor_planner
+from factor_planner import execute_plan, plan_fetches, resolve_factors
+
+
+def hitter(name, home_away):
+    return {"player_name": name, "prop_type": "Hits", "home_away": home_away, "ballpark": "N/A"}
+
+
+def test_league_tables_are_fetched_once_per_slate(monkeypatch):
+    downloads = []
+
+    def home_away_ratios(season):
+        downloads.append(("home_away", season))
+        return {"mookie betts": 1.1, "jose ramirez": 0.8}
+
+    def trend_ratios(*window):
+        downloads.append(("recent_trend",) + window)
+        return {"mookie betts": 1.2}
+
+    monkeypatch.setitem(factor_planner.FACTORS["home_away"], "fetch", home_away_ratios)
+    monkeypatch.setitem(factor_planner.FACTORS["recent_trend"], "key", lambda ctx: ("d0", "d1", "d2"))
+    monkeypatch.setitem(factor_planner.FACTORS["recent_trend"], "fetch", trend_ratios)
+    props = [hitter("Mookie Betts", "Home"), hitter("José Ramírez", "Away"), hitter("Nolan Jones", "Home")]
+
+    resolved = execute_plan(plan_fetches(props))
+
+    assert len(downloads) == 2
+    assert resolve_factors(props[0], resolved) == {"home_away": 1.1, "recent_trend": 1.2}
+    assert resolve_factors(props[1], resolved) == {"home_away": 1.25, "recent_trend": 1.0}
+    assert resolve_factors(props[2], resolved) == {"home_away": 1.0, "recent_trend": 1.0}
+
+
+def test_unknown_home_away_skips_the_split():
+    ctx = hitter("Mookie Betts", "N/A")
+    assert all(name != "home_away" for name, _ in plan_fetches([ctx]))
+    assert "home_away" not in resolve_factors(ctx, {})
+
+
+def test_failed_league_download_is_neutral(monkeypatch):
+    def fail(season):
+        raise ConnectionError("fangraphs down")
+
+    monkeypatch.setitem(factor_planner.FACTORS["home_away"], "fetch", fail)
+    ctx = hitter("Mookie Betts", "Home")
+    key = next(key for name, key in plan_fetches([ctx]) if name == "home_away")
+
+    assert factor_planner.fetch_factor("home_away", key) == {}
+    assert resolve_factors(ctx, {("home_away", key): {}})["home_away"] == 1.0
@@ -0,0 +1,69 @@
+from lineup_poller import DeltaPoller, diff_game, parse_game_snapshot
+from replay_stub import ReplayStub, load_fixture
+
+DATE = "2026-10-18"
+
+
+def snapshot(name):
+    return parse_game_snapshot(load_fixture(name)["dates"][0]["games"][0])
+
+
+def test_unchanged_schedule_is_a_304_with_no_deltas():
+    deltas = []
+    with ReplayStub(["schedule_initial.json", "schedule_scratch.json"]) as stub:
+        poller = DeltaPoller(deltas.append, base_url=stub.base_url)
+        first = poller.poll_once(DATE)
+        second = poller.poll_once(DATE)
+        stub.advance()
+        third = poller.poll_once(DATE)
+
+    assert [d["new_game"] for d in first] == [True]
+    assert second == []
+    assert "If-None-Match" not in stub.requests[0]["headers"]
+    assert stub.requests[1]["headers"]["If-None-Match"] == '"schedule-0"'
+    assert "hydrate=probablePitcher%2Clineups%2Cofficials" in stub.requests[0]["path"]
+    assert [d["changes"].keys() for d in third] == [{"home_lineup"}]
+    assert deltas == first + third
+
+
+def test_scratch_affects_swapped_hitters_and_opposing_pitcher():
+    delta = diff_game(745001, snapshot("schedule_initial.json"), snapshot("schedule_scratch.json"))
+    assert set(delta["changes"]) == {"home_lineup"}
+    # Players are identified by MLBAM ID: Nolan Jones, Brenton Doyle, Yu Darvish
+    assert delta["players"] == {666969, 680694, 506433}
+
+
+def test_probable_swap_and_umpire_change():
+    delta = diff_game(745001, snapshot("schedule_scratch.json"), snapshot("schedule_probable_umpire.json"))
+    assert set(delta["changes"]) == {"away_probable", "plate_umpire"}
+    assert delta["changes"]["plate_umpire"] == ("Pat Hoberg", "Will Little")
+    # An umpire change touches everyone in the game, old and new probables included
+    assert delta["players"] == {
+        506433, 808967, 656282,          # Darvish, Yamamoto, Freeland
+        605141, 518692, 672580, 680694,  # Betts, Freeman, Tovar, Doyle
+    }
+
+
+def test_probable_swap_only_affects_pitchers_and_opposing_lineup():
+    old = snapshot("schedule_scratch.json")
+    new = dict(old, away_probable=808967)
+    delta = diff_game(745001, old, new)
+    assert delta["players"] == {506433, 808967, 672580, 680694}
+
+
+def test_venue_change_affects_everyone():
+    old = snapshot("schedule_initial.json")
+    new = dict(old, venue="Dodger Stadium")
+    delta = diff_game(745001, old, new)
+    assert set(delta["changes"]) == {"venue"}
+    assert 605141 in delta["players"] and 656282 in delta["players"]
+
+
+def test_unchanged_game_has_no_delta():
+    assert diff_game(745001, snapshot("schedule_initial.json"), snapshot("schedule_initial.json")) is None
+
+
+def test_person_without_id_falls_back_to_plain_name():
+    game = load_fixture("schedule_initial.json")["dates"][0]["games"][0]
+    game["teams"]["home"]["probablePitcher"] = {"fullName": "Germán Márquez"}
+    assert parse_game_snapshot(game)["home_probable"] == "german marquez"
@@ -0,0 +1,61 @@
+from itertools import combinations
+
+import numpy as np
+
+from parlay_engine import DEFAULT_PAYOUTS, legs_from_results, search_parlays, simulate_hits
+
+
+def slate():
+    rows = []
+    games = ["Coors Field", "Fenway Park", "Petco Park"]
+    markets = ["Hits", "Total Bases", "Pitcher Strikeouts", "Runs"]
+    for i in range(9):
+        rows.append({
+            "Player": f"Player {i % 8}",  # one player appears twice
+            "Prop": markets[i % len(markets)],
+            "Line": 0.5,
+            "Side": "Under" if i % 3 == 0 else "Over",
+            "Edge": 0.05 + 0.02 * i,
+            "Ballpark": games[i % len(games)],
+            "Home/Away": "Home" if i % 2 else "Away",
+            "Note": "",
+        })
+    return rows
+
+
+def brute_force(legs, hits, min_legs, max_legs, top_n):
+    entries = []
+    for size in range(min_legs, max_legs + 1):
+        for combo in combinations(range(len(legs)), size):
+            if len({legs[i]["player"] for i in combo}) < size:
+                continue
+            joint = hits[list(combo)].all(axis=0).mean()
+            entries.append((joint * DEFAULT_PAYOUTS[size] - 1.0, combo))
+    entries.sort(key=lambda e: -e[0])
+    return entries[:top_n]
+
+
+def test_pruned_beam_search_matches_brute_force():
+    legs = legs_from_results(slate())
+    hits = simulate_hits(legs, n_trials=4000, seed=7)
+    for top_n in (1, 5, 15):
+        found = search_parlays(legs, hits, min_legs=2, max_legs=5, top_n=top_n, beam_width=500)
+        expected = brute_force(legs, hits, 2, 5, top_n)
+        assert np.allclose([e["ev"] for e in found], [ev for ev, _ in expected], atol=1e-6)
+        # Ties aside, the same entries are found
+        exact = {combo for ev, combo in expected if ev > expected[-1][0] + 1e-9}
+        assert exact <= {tuple(e["legs"]) for e in found}
+
+
+def test_under_leg_keeps_its_own_marginal():
+    rows = [
+        {"Player": "A", "Prop": "Hits", "Line": 0.5, "Side": "Under", "Edge": 0.2,
+         "Ballpark": "Coors Field", "Home/Away": "Home", "Note": ""},
+        {"Player": "B", "Prop": "Hits", "Line": 0.5, "Side": "Over", "Edge": 0.1,
+         "Ballpark": "Coors Field", "Home/Away": "Home", "Note": ""},
+    ]
+    legs = legs_from_results(rows)
+    hits = simulate_hits(legs, n_trials=200000, seed=1)
+    assert np.allclose(hits.mean(axis=1), [0.7, 0.6], atol=0.01)
+    # Under on one teammate and over on the other are negatively correlated
+    assert (hits[0] & hits[1]).mean() < 0.7 * 0.6
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+
+from evaluate_prop_v2 import evaluate_prop_v2
+from prop_distribution import fit_mean, outcome_distribution, prob_over, prob_under
+from slate_evaluator import main_lines
+
+
+def test_lines_are_a_vectorized_cdf_lookup():
+    dist = outcome_distribution("Pitcher Strikeouts")
+    over = prob_over(dist, [4.5, 5, 5.5])
+    under = prob_under(dist, [4.5, 5, 5.5])
+    # Half-lines split the outcomes; an integer line leaves the push out of both
+    assert np.allclose(over[[0, 2]] + under[[0, 2]], 1.0)
+    assert math.isclose(over[1] + under[1] + dist["pmf"][5], 1.0)
+    assert over[1] == over[2]
+
+
+def test_main_line_is_a_coin_flip_moved_by_the_factors():
+    p_neutral, _, _, _, edge = evaluate_prop_v2("A", "Home Runs", 0.5, "over", True, "N/A", 1, factors={})
+    p_over, _, _, rec, edge_up = evaluate_prop_v2("A", "Home Runs", 0.5, "over", True, "N/A", 1,
+                                                  factors={"ballpark": 1.2})
+    p_under, *_ = evaluate_prop_v2("A", "Home Runs", 0.5, "under", True, "N/A", 1, factors={"ballpark": 1.2})
+    assert math.isclose(p_neutral, 0.5) and math.isclose(edge, 0.0, abs_tol=1e-9)
+    # mu = ln 2 at the 0.5 line, scaled by the factor
+    assert math.isclose(p_over, 1 - 0.5 ** 1.2)
+    assert math.isclose(edge_up, p_over - 0.5)
+    assert math.isclose(p_over + p_under, 1.0)
+    assert rec == "⚠️ Cautious"
+
+
+def test_alternate_lines_are_priced_from_the_main_line():
+    assert math.isclose(fit_mean(4.5), 4.670908882795983)
+    dist = outcome_distribution("Pitcher Strikeouts", main_line=4.5)
+    p_alt, *_ = evaluate_prop_v2("A", "Pitcher Strikeouts", 6.5, "over", True, "N/A", 1,
+                                 factors={}, main_line=4.5)
+    assert math.isclose(prob_over(dist, [4.5])[0], 0.5)
+    assert math.isclose(p_alt, prob_over(dist, [6.5])[0]) and p_alt < 0.5
+
+
+def test_main_line_is_the_even_money_or_median_line():
+    rows = [
+        {"Player": "José Ramírez", "Market Name": "Total Bases", "Line": "1.5", "Odds": "-115"},
+        {"Player": "Jose Ramirez", "Market Name": "Total Bases", "Line": "2.5", "Odds": "+180"},
+        {"Player": "Kyle Freeland", "Market Name": "Pitcher Strikeouts", "Line": "3.5"},
+        {"Player": "Kyle Freeland", "Market Name": "Pitcher Strikeouts", "Line": "4.5"},
+        {"Player": "Kyle Freeland", "Market Name": "Pitcher Strikeouts", "Line": "5.5"},
+        {"Player": "Kyle Freeland", "Market Name": "Pitching Outs", "Line": ""},
+    ]
+    assert main_lines(rows) == [1.5, 1.5, 4.5, 4.5, 4.5, None]
+
+
+def test_no_line_falls_back_to_scaled_baseline():
+    prob, *_ = evaluate_prop_v2("A", "Hits", None, "over", True, "N/A", 1, factors={"weather": 1.1})
+    assert math.isclose(prob, 0.55)
@@ -0,0 +1,50 @@
+import slate_evaluator
+from game_utils import get_plate_umpire, get_game_info_for_player
+from replay_stub import load_fixture
+
+ROSTER = {"kyle freeland": 656282, "mookie betts": 605141}
+TEAMS = {656282: {"team_id": 115, "team_name": "Colorado Rockies"},
+         605141: {"team_id": 119, "team_name": "Los Angeles Dodgers"}}
+
+
+def _schedule():
+    game = load_fixture("schedule_initial.json")["dates"][0]["games"][0]
+    return [{"home_team_id": 115, "away_team_id": 119, "ballpark": "Coors Field",
+             "plate_umpire": get_plate_umpire(game)}]
+
+
+def test_game_info_resolves_player_team_and_game():
+    assert get_game_info_for_player("Kyle Freeland", ROSTER, TEAMS, _schedule()) == {
+        "home_away": "Home", "ballpark": "Coors Field", "plate_umpire": "Pat Hoberg"}
+    assert get_game_info_for_player("Mookie Betts", ROSTER, TEAMS, _schedule())["home_away"] == "Away"
+    # Known player whose team is off today
+    assert get_game_info_for_player("Mookie Betts", ROSTER, TEAMS, [])["ballpark"] == "N/A"
+
+
+def test_plate_umpire_from_schedule_reaches_the_umpire_factor():
+    row = {"Player": "Kyle Freeland", "Market Name": "Pitcher Strikeouts", "Lean": "Over", "Line": "4.5"}
+
+    ctx = slate_evaluator.prepare_row(row, ROSTER, TEAMS, _schedule())
+
+    assert (ctx["home_away"], ctx["ballpark"]) == ("Home", "Coors Field")
+    assert ctx["umpire"] == "Pat Hoberg"
+    assert ("umpire", ("Pat Hoberg", "strikeout")) in slate_evaluator.plan_fetches([ctx])
+
+
+def test_failed_lookup_is_reported_on_its_row_only(monkeypatch):
+    def lookup(name, *args):
+        if name == "Mookie Betts":
+            raise RuntimeError("schedule unavailable")
+        return get_game_info_for_player(name, *args)
+
+    monkeypatch.setattr(slate_evaluator, "get_game_info_for_player", lookup)
+    rows = [{"Player": "Mookie Betts", "Market Name": "Hits", "Lean": "Over", "Line": "0.5"},
+            {"Player": "Kyle Freeland", "Market Name": "Pitcher Strikeouts", "Lean": "Over", "Line": "4.5"}]
+
+    results = slate_evaluator.evaluate_slate(rows, ROSTER, TEAMS, _schedule(), fetch=lambda name, key: 1.0)
+
+    assert results[0]["Note"] == "⚠️ Lookup failed: schedule unavailable"
+    assert results[1]["Note"] == "" and results[1]["Ballpark"] == "Coors Field"
+    # A lone line is its own main line, and the curve is centred on it
+    assert abs(results[1]["Edge"]) < 1e-9
+    assert results[1]["Curve Lines"] == "1.5–7.5" and results[1]["Curve"][3] == 0.5